@@ -8,12 +8,15 @@ in the given directory are not downloaded again.
 The tour overview raw json data is stored in the current directory (tours.json).
 """
 import argparse
+import concurrent.futures
 import getpass
 import os
 import sys
 
-import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from pykomoot_tours import KomootTours
 
@@ -26,26 +29,71 @@ _URLS = {
     'download': 'https://www.komoot.de/tour/{tourname}/download',
 }
 
+_MAX_WORKERS = 8  # number of concurrent downloads, must not exceed pool_maxsize of the session
 
-def _save_response(response, file_name):
-    """Save requests response to file."""
-    with open(file_name, 'wb') as file:
-        file.write(response.content)
 
+def _stream_response(response, file_name, chunk_size=64 * 1024):
+    """Write streamed requests response to file chunk by chunk and close it.
 
-def _save_text(text, file_name):
-    """Save text to file."""
-    with open(file_name, 'w') as file:
-        file.write(text)
+    The data goes to a temporary <file_name>.part first, so an interrupted
+    download never leaves a truncated file under the final name.
+    """
+    part_file_name = file_name + '.part'
+    try:
+        with response, open(part_file_name, 'wb') as file:
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+        os.replace(part_file_name, file_name)
+    except BaseException:
+        try:
+            os.remove(part_file_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _download_one(komoot, tourname, out_file_path):
+    """Download one tour and write it to file.
+
+    :param komoot: Logged in instance of PyKomoot.
+    :param tourname: ID of tour to download.
+    :param out_file_path: File path of GPX file.
+    """
+    _stream_response(komoot.download_tour(tourname), out_file_path)
+
+
+def _save_bytes(data, file_name):
+    """Save bytes to file."""
+    with open(file_name, 'wb') as file:
+        file.write(data)
 
 
 class PyKomoot(object):
     """PyKomoot"""
+
+    __slots__ = ('email', 'session', 'username', '_tour_pages')
+
     def __init__(self):
         self.email = None
         self.session = requests.Session()
+        # All requests go to the same host: keep a single pool of persistent
+        # connections which is large enough for the concurrent downloads and
+        # retry on temporary server errors.
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32, max_retries=retries)
+        self.session.mount('https://www.komoot.de', adapter)
+        self.session.headers['Connection'] = 'keep-alive'
         self.username = None  # actually user ID as obtained from Komoot
-        self.tours_json = None  # json raw data of Komoot tours
+        self._tour_pages = None  # json data of Komoot tour overview pages
+
+    def dump_tours_json(self):
+        """Serialize the downloaded tour overview pages.
+
+        :returns: json raw data of Komoot tours (type: bytes) or None if nothing was downloaded
+        """
+        if self._tour_pages is None:
+            return None
+        return orjson.dumps(self._tour_pages)
 
     def login(self, email, password):
         """Login to komoot.de and get username (ID).
@@ -64,25 +112,41 @@ class PyKomoot(object):
         response = session.get(_URLS['login'])
         self.username = response.json()['username']
 
+    def _get_tour_page(self, page):
+        """Download one page of the tour overview.
+
+        :param page: Page number (starting at 0).
+        :returns: json data of the page (type: dict)
+        """
+        response = self.session.get(_URLS['tours'].format(username=self.username), params={'page': page, 'limit': 100})
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
     def get_tour_overview(self):
         """Download tour overview page and create KomootTours object.
 
         :returns: Instance of KomootTours
         """
-        self.tours_json = None
-        session = self.session
-        json_data_list = []
-        for page in range(100):
-            response = session.get(_URLS['tours'].format(username=self.username), params={'page': page, 'limit': 100})
-            try:
-                response.raise_for_status()
-            except requests.exceptions.HTTPError:
-                # no more pages with data
-                break
-            json_data_list.append(json.loads(response.text))
-        if json_data_list:
-            self.tours_json = json.dumps(json_data_list)
-        return KomootTours(self.tours_json)
+        self._tour_pages = None
+        first_page = self._get_tour_page(0)
+        self._tour_pages = [first_page]
+        total_pages = first_page.get('page', {}).get('totalPages')
+        if total_pages is None:
+            # No page count given: request pages until there are no more.
+            for page in range(1, 100):
+                try:
+                    self._tour_pages.append(self._get_tour_page(page))
+                except requests.exceptions.HTTPError:
+                    # no more pages with data
+                    break
+        else:
+            # The first page tells how many pages there are, get the others concurrently.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+                # Keep pages as they arrive (in order), so they can still be saved
+                # if a later page fails.
+                for json_data in executor.map(self._get_tour_page, range(1, min(total_pages, 100))):
+                    self._tour_pages.append(json_data)
+        return KomootTours(self._tour_pages)
 
     def __str__(self):
         ret = []
@@ -93,13 +157,20 @@ class PyKomoot(object):
         return '\n'.join(ret)
 
     def download_tour(self, tourname):
-        """Download one tour and return as requests response.
+        """Download one tour and return as streamed requests response.
+
+        The body has not been read yet. Use _stream_response() to write it to
+        a file, which also releases the connection.
 
         :param tourname: ID of tour to download.
-        :returns: GPX file as text (type: str)
+        :returns: GPX file (type: requests.Response)
         """
-        response = self.session.get(_URLS['download'].format(tourname=str(tourname)))
-        response.raise_for_status()
+        response = self.session.get(_URLS['download'].format(tourname=str(tourname)), stream=True)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
         return response
 
     def __del__(self):
@@ -133,8 +204,9 @@ def main():
         sys.exit(1)
     finally:
         # If we successfuly got a tour overview page save it in any case.
-        if komoot.tours_json:
-            _save_text(komoot.tours_json, 'tours.json')
+        tours_json = komoot.dump_tours_json()
+        if tours_json:
+            _save_bytes(tours_json, 'tours.json')
             print('Saved tour overview page to "tours.json"')
     print('')
     print(komoot)
@@ -142,22 +214,35 @@ def main():
     if download_dir:
         print('Downloading GPX files:')
         os.makedirs(download_dir, exist_ok=True)
+        existing_files = set(os.listdir(download_dir))
         files_skipped = 0
         tours = ktours.planned if args.planned else ktours.recorded
+        prefix = os.path.join(download_dir, '')  # ends with exactly one path separator
+        downloads = []
         for tour in tours:
             tourname = tour['id']
             tourdate = tour['date'][:10]  # get date from string '2019-01-01T19:35:14.000Z'
-            out_file_path = os.path.join(download_dir, '{}_{}.gpx'.format(tourdate, tourname))
-            if os.path.exists(out_file_path):
+            file_name = f'{tourdate}_{tourname}.gpx'
+            if file_name in existing_files:
                 files_skipped += 1
                 continue
+            downloads.append((tourname, f'{prefix}{file_name}'))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+            futures = {executor.submit(_download_one, komoot, tourname, out_file_path): out_file_path
+                       for tourname, out_file_path in downloads}
             try:
-                response_gpx = komoot.download_tour(tourname)
-            except requests.exceptions.HTTPError:
-                print('  Failed to download: ', out_file_path)
-                continue
-            _save_response(response_gpx, out_file_path)
-            print('  ', out_file_path)
+                for future in concurrent.futures.as_completed(futures):
+                    out_file_path = futures[future]
+                    try:
+                        future.result()
+                    except requests.exceptions.RequestException:
+                        print('  Failed to download: ', out_file_path)
+                        continue
+                    print('  ', out_file_path)
+            except BaseException:
+                # Ctrl-C or unexpected error: do not start the remaining downloads.
+                executor.shutdown(cancel_futures=True)
+                raise
         if files_skipped:
             print('Skipped downloading of {} files which are already present.'.format(files_skipped))
 
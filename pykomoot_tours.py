@@ -4,9 +4,10 @@
 Use pykomoot_gpx.py to download raw json data.
 """
 import argparse
-import json
 import csv
-from collections import defaultdict
+from operator import itemgetter
+
+import orjson
 
 # This list contains fields (columns) which are omitted when
 # writing the csv file. Comment lines if you want to include them.
@@ -30,15 +31,15 @@ EXCLUDE_FIELDS = [
 class KomootTours(object):
     """KomootTours class"""
 
-    def __init__(self, raw_json_str):
-        """Parse json data and get all fields (columns).
+    __slots__ = ('json_data', 'all_fields', '_sorted_fields', '_planned', '_recorded')
+
+    def __init__(self, list_json_data):
+        """Collect tours of all pages and get all fields (columns).
 
-        :param raw_json_str: Tour overview json data as returned by komoot API (type: str).
+        :param list_json_data: Tour overview pages as returned by komoot API (type: list).
         """
         self.json_data = []
         self.all_fields = set()
-        list_json_data = json.loads(raw_json_str)
-        # print(json.dumps(self.json_data, indent=2, sort_keys=True))
         for list_entry in list_json_data:
             self.json_data += list_entry['_embedded']['tours']
         # Not all tours have the same fields. "tour_recorded" and "tour_planned"
@@ -46,21 +47,32 @@ class KomootTours(object):
         # over the years. Find them all:
         for tour in self.json_data:
             self.all_fields |= set(tour.keys())
+        self._sorted_fields = sorted(self.all_fields)
+        self._planned = [t for t in self.json_data if t['type'] == 'tour_planned']
+        self._recorded = [t for t in self.json_data if t['type'] == 'tour_recorded']
+
+    @classmethod
+    def from_json(cls, raw_json):
+        """Parse json data and create KomootTours object.
+
+        :param raw_json: Tour overview json data as returned by komoot API (type: bytes or str).
+        :returns: Instance of KomootTours
+        """
+        return cls(orjson.loads(raw_json))
 
     @property
     def planned(self):
-        return (t for t in self.json_data if t['type'] == 'tour_planned')
+        return self._planned
 
     @property
     def recorded(self):
-        return (t for t in self.json_data if t['type'] == 'tour_recorded')
+        return self._recorded
 
     def __str__(self):
         ret = []
-        ret.append('Tours planned:  {}'.format(sum(1 for _ in self.planned)))
-        distances = [float(t['distance']) for t in self.recorded]
-        total_distance = sum(distances) / 1000  # in km
-        ret.append('Tours recorded: {} (total distance: {:.0f} km)'.format(len(distances),
+        ret.append('Tours planned:  {}'.format(len(self._planned)))
+        total_distance = sum(float(t['distance']) for t in self._recorded) / 1000  # in km
+        ret.append('Tours recorded: {} (total distance: {:.0f} km)'.format(len(self._recorded),
                                                                            total_distance))
         return '\n'.join(ret)
 
@@ -71,30 +83,37 @@ class KomootTours(object):
         :param exclude_fields: (optional) List of fields (columns) to ommit
         """
         try:
-            exclude_fields = set(exclude_fields)
+            exclude_fields = frozenset(exclude_fields)
         except TypeError:
-            exclude_fields = set()
+            exclude_fields = frozenset()
+        # Filtering the already sorted fields keeps them sorted.
+        fieldnames = [field for field in self._sorted_fields if field not in exclude_fields]
+        blank = dict.fromkeys(fieldnames, '')
         with open(csv_file_path, mode='w', encoding='utf-8') as _f:
-            fields = self.all_fields - exclude_fields
-            writer = csv.DictWriter(_f, dialect='excel', fieldnames=sorted(fields))
-            writer.writeheader()
-            for tour in self.json_data:
-                filtered_tour = {key: value for (key, value) in tour.items() if key in fields}
-                writer.writerow(defaultdict(lambda: '', filtered_tour))
+            writer = csv.writer(_f, dialect='excel')
+            writer.writerow(fieldnames)
+            if not fieldnames:
+                return
+            getter = itemgetter(*fieldnames)
+            rows = (getter({**blank, **tour}) for tour in self.json_data)
+            if len(fieldnames) == 1:
+                # itemgetter() returns a bare value instead of a tuple for a single field
+                rows = ((value,) for value in rows)
+            writer.writerows(rows)
 
 
 def main():
     parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
     parser.add_argument('tours_json', help='Komoot tours raw json file')
     args = parser.parse_args()
-    json_text = None
+    json_bytes = None
     try:
-        with open(args.tours_json) as json_file:
-            json_text = json_file.read()
+        with open(args.tours_json, 'rb') as json_file:
+            json_bytes = json_file.read()
     except FileNotFoundError:
         print('Could not open {}.'.format(args.tours_json))
-    if json_text:
-        ktours = KomootTours(json_text)
+    if json_bytes:
+        ktours = KomootTours.from_json(json_bytes)
         print(ktours)
         ktours.to_csv('tours.csv', exclude_fields=EXCLUDE_FIELDS)
         print('Converted {} to CSV file "tours.csv".'.format(args.tours_json))